@@ -1,63 +1,67 @@
 #!/usr/bin/env python3
-import requests
+from bisect import bisect_left, bisect_right
+import functools
+import gzip
+import hashlib
+import http.client
 import json
+import os
+import queue
+import socket
 import sys
-from datetime import datetime, timedelta
-import calendar
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from datetime import date, datetime, timedelta
 import re
 
-DAYS_FORECAST = 5
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
+DAYS_FORECAST = 5
+# Hourly rows from the current hour; 48 always covers the rest of today
+# and all of tomorrow.
+FORECAST_HOURS = 48
+
+CACHE_DIR = Path.home() / ".cache" / "waybar-weather"
+LOCATION_CACHE = CACHE_DIR / "loc.json"
+LOCATION_TTL = 24 * 60 * 60
+WEATHER_CACHE = CACHE_DIR / "weather.json"
+WEATHER_TTL = 10 * 60
+OUTPUT_CACHE = CACHE_DIR / "tooltip.bin"
+
+# code: (icon, description, short description for forecast rows)
 WEATHER_MAP = {
-    0: ("☀️", "Clear sky"),
-    1: ("🌤️", "Mainly clear"),
-    2: ("⛅", "Partly cloudy"),
-    3: ("☁️", "Overcast"),
-    45: ("🌫️", "Fog"),
-    48: ("🌫️", "Depositing rime fog"),
-    51: ("🌦️", "Light drizzle"),
-    53: ("🌦️", "Moderate drizzle"),
-    55: ("🌦️", "Dense drizzle"),
-    61: ("🌧️", "Slight rain"),
-    63: ("🌧️", "Moderate rain"),
-    65: ("🌧️", "Heavy rain"),
-    66: ("🌧️", "Light freezing rain"),
-    67: ("🌧️", "Heavy freezing rain"),
-    71: ("❄️", "Slight snow"),
-    73: ("❄️", "Moderate snow"),
-    75: ("❄️", "Heavy snow"),
-    80: ("🌦️", "Slight rain showers"),
-    81: ("🌧️", "Moderate rain showers"),
-    82: ("🌧️", "Violent rain showers"),
-    95: ("⛈️", "Thunderstorm"),
-    96: ("⛈️", "Thunderstorm with hail (slight)"),
-    99: ("⛈️", "Thunderstorm with hail (severe)"),
-}
-
-SHORT_DESC_MAP = {
-    "Slight rain showers": "Slight rain",
-    "Moderate rain showers": "Moderate rain",
-    "Violent rain showers": "Heavy rain",
-    "Thunderstorm with hail (slight)": "Hail Storm",
-    "Thunderstorm with hail (severe)": "Severe Storm",
-    "Light drizzle": "Drizzle",
-    "Moderate drizzle": "Mod drizzle",
-    "Dense drizzle": "Dense drizzle",
-    "Slight rain": "Slight rain",
-    "Moderate rain": "Mod rain",
-    "Heavy rain": "Heavy rain",
-    "Light freezing rain": "Freezing rain",
-    "Heavy freezing rain": "Heavy freeze",
-    "Slight snow": "Snow",
-    "Moderate snow": "Mod snow",
-    "Heavy snow": "Heavy snow",
-    "Clear sky": "Clear",
-    "Mainly clear": "Mainly clear",
-    "Partly cloudy": "Part cloudy",
-    "Overcast": "Overcast",
-    "Fog": "Fog",
-    "Depositing rime fog": "Rime fog",
+    0: ("☀️", "Clear sky", "Clear"),
+    1: ("🌤️", "Mainly clear", "Mainly clear"),
+    2: ("⛅", "Partly cloudy", "Part cloudy"),
+    3: ("☁️", "Overcast", "Overcast"),
+    45: ("🌫️", "Fog", "Fog"),
+    48: ("🌫️", "Depositing rime fog", "Rime fog"),
+    51: ("🌦️", "Light drizzle", "Drizzle"),
+    53: ("🌦️", "Moderate drizzle", "Mod drizzle"),
+    55: ("🌦️", "Dense drizzle", "Dense drizzle"),
+    61: ("🌧️", "Slight rain", "Slight rain"),
+    63: ("🌧️", "Moderate rain", "Mod rain"),
+    65: ("🌧️", "Heavy rain", "Heavy rain"),
+    66: ("🌧️", "Light freezing rain", "Freezing rain"),
+    67: ("🌧️", "Heavy freezing rain", "Heavy freeze"),
+    71: ("❄️", "Slight snow", "Snow"),
+    73: ("❄️", "Moderate snow", "Mod snow"),
+    75: ("❄️", "Heavy snow", "Heavy snow"),
+    80: ("🌦️", "Slight rain showers", "Slight rain"),
+    81: ("🌧️", "Moderate rain showers", "Moderate rain"),
+    82: ("🌧️", "Violent rain showers", "Heavy rain"),
+    95: ("⛈️", "Thunderstorm", "Thunderstorm"),
+    96: ("⛈️", "Thunderstorm with hail (slight)", "Hail Storm"),
+    99: ("⛈️", "Thunderstorm with hail (severe)", "Severe Storm"),
 }
+_UNKNOWN = ("❓", "Unknown", "Unknown")
 
 FG_HEADER = "#f4b8e4"
 FG_TEXT = "#ffffff"
@@ -74,57 +78,296 @@ TEMP_COLORS = [
     (100, "#e78284"),
 ]
 
+_TEMP_KEYS = [t for t, _ in TEMP_COLORS]
+_TEMP_VALS = [c for _, c in TEMP_COLORS]
+
+_TAG_RE = re.compile(r"<[^>]*>")
+
+_DAY_ABBR = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+TIME_LABELS = {6: "Morning", 12: "Midday", 15: "Afternoon", 18: "Evening"}
+
+HTTP_HEADERS = {"Accept-Encoding": "gzip", "User-Agent": "waybar-weather/1"}
+HTTP_CONNECT_TIMEOUT = 1.5
+HTTP_READ_TIMEOUT = 3.5
+# Connection failures are only retried while a full attempt still fits in
+# this budget, so a stalled host costs one connect timeout, not three.
+HTTP_DEADLINE = 6.0
+HTTP_RETRIES = 2
+HTTP_BACKOFF = 0.2
+
+
+def _loads(data):
+    """Decode JSON from bytes or str, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps(obj):
+    """Encode obj as UTF-8 JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode()
+
 
 def temp_to_color(temp):
     """Return color based on temperature threshold."""
-    for t_max, color in TEMP_COLORS:
-        if temp <= t_max:
-            return color
-    return TEMP_COLORS[-1][1]
+    i = bisect_left(_TEMP_KEYS, temp)
+    return _TEMP_VALS[i] if i < len(_TEMP_VALS) else _TEMP_VALS[-1]
 
 
 def get_weather_info(code):
     """Return icon and description for weather code."""
-    return WEATHER_MAP.get(code, ("❓", "Unknown"))
+    icon, desc, _ = WEATHER_MAP.get(code, _UNKNOWN)
+    return icon, desc
+
 
+def max_line_length(lines, headings=()):
+    """Calculate max line length excluding markup tags.
 
-def get_short_desc(desc):
-    """Return shortened description for display."""
-    return SHORT_DESC_MAP.get(desc, desc)
+    Headings contain no markup and are measured as-is. Stripping tags never
+    makes a line longer, so only lines whose raw length exceeds the current
+    maximum need to be stripped.
+    """
+    longest = max((len(h) for h in headings), default=0)
+    for line in lines:
+        if len(line) > longest:
+            longest = max(longest, len(_TAG_RE.sub("", line)))
+    return longest
 
 
-def max_line_length(lines):
-    """Calculate max line length excluding markup tags."""
-    clean = [re.sub(r"<.*?>", "", line) for line in lines]
-    return max((len(x) for x in clean), default=0)
+def emit(output):
+    """Write encoded JSON output for waybar to stdout."""
+    sys.stdout.buffer.write(output + b"\n")
 
 
 def fail(msg="Weather unavailable"):
     """Output error message and exit."""
-    print(
-        json.dumps(
+    emit(
+        _dumps(
             {"text": " | N/A", "tooltip": f"<span foreground='{FG_HEADER}'>{msg}</span>"}
         )
     )
     sys.exit(0)
 
 
-def get_location_by_ip():
-    """Get latitude, longitude, and city name from IP address."""
+@functools.lru_cache(maxsize=32)
+def _resolve_ipv4(host):
+    """Return the IPv4 addresses of host, cached for the life of the process.
+
+    Resolution errors propagate, so a transient failure is not cached.
+    """
+    infos = socket.getaddrinfo(host, None, socket.AF_INET, socket.SOCK_STREAM)
+    return tuple(dict.fromkeys(info[4][0] for info in infos))
+
+
+def _resolve_ipv6(host):
+    """Return the IPv6 addresses of host."""
+    infos = socket.getaddrinfo(host, None, socket.AF_INET6, socket.SOCK_STREAM)
+    return tuple(dict.fromkeys(info[4][0] for info in infos))
+
+
+def _create_connection(address, *args, **kwargs):
+    """Like socket.create_connection, but try IPv4 addresses first.
+
+    Some IPv6 routes to the lookup services stall until the timeout, so
+    IPv6 addresses are only tried once no IPv4 address connects.
+    """
+    host, port = address
+    err = None
+    for resolve in (_resolve_ipv4, _resolve_ipv6):
+        try:
+            addresses = resolve(host)
+        except socket.gaierror as e:
+            err = err or e
+            continue
+        for ip in addresses:
+            try:
+                return socket.create_connection((ip, port), *args, **kwargs)
+            except OSError as e:
+                err = e
+    raise err or OSError(f"no addresses found for {host}")
+
+
+class _SplitTimeoutMixin:
+    """Connect with HTTP_CONNECT_TIMEOUT, then read with HTTP_READ_TIMEOUT."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._create_connection = _create_connection
+
+    def connect(self):
+        super().connect()
+        self.sock.settimeout(HTTP_READ_TIMEOUT)
+
+
+class _HTTPConnection(_SplitTimeoutMixin, http.client.HTTPConnection):
+    pass
+
+
+class _HTTPSConnection(_SplitTimeoutMixin, http.client.HTTPSConnection):
+    pass
+
+
+class _HTTPHandler(urllib.request.HTTPHandler):
+    def http_open(self, req):
+        return self.do_open(_HTTPConnection, req)
+
+
+class _HTTPSHandler(urllib.request.HTTPSHandler):
+    def https_open(self, req):
+        return self.do_open(_HTTPSConnection, req, context=self._context)
+
+
+_OPENER = urllib.request.build_opener(_HTTPHandler, _HTTPSHandler)
+
+
+def _get(url):
+    """GET url and return the (decompressed) body, retrying connection errors.
+
+    urllib wraps connect-phase failures in URLError; read timeouts and HTTP
+    errors are raised as-is and never retried.
+    """
+    req = urllib.request.Request(url, headers=HTTP_HEADERS)
+    deadline = time.monotonic() + HTTP_DEADLINE
+    for attempt in range(HTTP_RETRIES + 1):
+        try:
+            with _OPENER.open(req, timeout=HTTP_CONNECT_TIMEOUT) as r:
+                raw = r.read()
+                if r.headers.get("Content-Encoding") == "gzip":
+                    raw = gzip.decompress(raw)
+                return raw
+        except urllib.error.HTTPError:
+            raise
+        except urllib.error.URLError:
+            delay = HTTP_BACKOFF * 2**attempt
+            retry_end = (
+                time.monotonic() + delay + HTTP_CONNECT_TIMEOUT + HTTP_READ_TIMEOUT
+            )
+            if attempt == HTTP_RETRIES or retry_end > deadline:
+                raise
+            time.sleep(delay)
+
+
+def _get_json(url):
+    """GET url and decode the JSON body."""
+    return _loads(_get(url))
+
+
+def run_in_background(results, fn, *args):
+    """Run fn(*args) on a daemon thread and put its result, or the exception
+    it raised, on the results queue.
+
+    Daemon threads are not joined at exit, so an abandoned request never
+    keeps the process (and with it the waybar tick) alive.
+    """
+
+    def target():
+        try:
+            results.put(fn(*args))
+        except Exception as e:
+            results.put(e)
+
+    threading.Thread(target=target, daemon=True).start()
+
+
+def read_cache(path, ttl=None):
+    """Return cached JSON from path, or None if missing or older than ttl."""
     try:
-        r = requests.get("https://checkip.amazonaws.com", timeout=5)
-        ip = r.text.strip()
+        if ttl is not None and time.time() - path.stat().st_mtime >= ttl:
+            return None
+        return _loads(path.read_bytes())
+    except (OSError, ValueError):
+        return None
 
-        r = requests.get(f"http://ip-api.com/json/{ip}", timeout=5)
-        r.raise_for_status()
-        data = r.json()
-        return data["lat"], data["lon"], data.get("city", "Your Location")
-    except Exception:
-        return 0.0, 0.0, "Your Location"
+
+def write_atomic(path, raw):
+    """Atomically write raw bytes to path."""
+    tmp = None
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("wb", dir=CACHE_DIR, delete=False) as f:
+            tmp = f.name
+            f.write(raw)
+        os.replace(tmp, path)
+    except OSError:
+        if tmp is not None:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+
+def write_cache(path, data):
+    """Atomically write data as JSON to path."""
+    write_atomic(path, _dumps(data))
+
+
+def read_weather_cache(url):
+    """Return cached weather data for url, or None if stale or for another URL."""
+    cached = read_cache(WEATHER_CACHE, WEATHER_TTL)
+    if isinstance(cached, dict) and cached.get("url") == url:
+        return cached.get("data")
+    return None
+
+
+def write_weather_cache(url, data):
+    """Cache weather data together with the URL it was fetched from."""
+    write_cache(WEATHER_CACHE, {"url": url, "data": data})
+
+
+def load_cached_location(ttl=None):
+    """Return the last known latitude, longitude, and city name, if any."""
+    cached = read_cache(LOCATION_CACHE, ttl)
+    try:
+        lat, lon, city = cached
+        return lat, lon, city
+    except (TypeError, ValueError):
+        return None
+
+
+def locate(url):
+    """Resolve latitude, longitude, and city name from an ip-api URL."""
+    data = _get_json(url)
+    return data["lat"], data["lon"], data.get("city", "Your Location")
+
+
+def locate_via_checkip():
+    """Look up the public IP first, then geolocate it."""
+    ip = _get("https://checkip.amazonaws.com").decode().strip()
+    return locate(f"http://ip-api.com/json/{ip}")
+
+
+def get_location_by_ip():
+    """Get latitude, longitude, and city name from IP address.
+
+    Races the checkip -> ip-api chain against a direct ip-api lookup and
+    returns whichever succeeds first. A location resolved within the last
+    day is reused without any network access, and the last known location
+    is used if both lookups fail.
+    """
+    cached = load_cached_location(LOCATION_TTL)
+    if cached:
+        return cached
+
+    results = queue.Queue()
+    run_in_background(results, locate_via_checkip)
+    run_in_background(results, locate, "http://ip-api.com/json/")
+    for _ in range(2):
+        location = results.get()
+        if not isinstance(location, Exception):
+            write_cache(LOCATION_CACHE, location)
+            return location
+    return load_cached_location() or (0.0, 0.0, "Your Location")
 
 
 def build_api_url(lat, lon):
-    """Build Open-Meteo API URL."""
+    """Build Open-Meteo API URL.
+
+    Only request what is rendered: hourly data from the current hour
+    through the end of tomorrow, and today plus DAYS_FORECAST daily rows.
+    """
     return (
         f"https://api.open-meteo.com/v1/forecast?"
         f"latitude={lat}&longitude={lon}"
@@ -132,27 +375,45 @@ def build_api_url(lat, lon):
         f"&hourly=temperature_2m,apparent_temperature,weathercode,"
         f"relativehumidity_2m,windspeed_10m,precipitation_probability,precipitation"
         f"&daily=temperature_2m_max,temperature_2m_min,weathercode,precipitation_sum"
+        f"&forecast_hours={FORECAST_HOURS}&forecast_days={DAYS_FORECAST + 1}"
         f"&timezone=auto"
     )
 
 
-def fetch_weather_data(url):
-    """Fetch weather data from API."""
+def fetch_weather_data(url, pending=None):
+    """Fetch weather data from API, reusing an in-flight request if given.
+
+    pending is a queue fed by run_in_background for the same URL. The
+    latest response is cached on disk for WEATHER_TTL seconds.
+    """
+    data = read_weather_cache(url)
+    if data is not None:
+        return data
+
     try:
-        r = requests.get(url, timeout=10)
-        r.raise_for_status()
-        return r.json()
+        if pending is not None:
+            data = pending.get()
+            if isinstance(data, Exception):
+                raise data
+        else:
+            data = _get_json(url)
     except Exception as e:
         fail(f"Failed to fetch weather: {e}")
 
+    write_weather_cache(url, data)
+    return data
+
 
 def find_current_hour_index(times, now):
     """Find index of current hour in times array."""
-    for i, t in enumerate(times):
-        dt = datetime.fromisoformat(t)
-        if dt.hour == now.hour and dt.date() == now.date():
-            return i
-    return 0
+    now_hour_s = now.strftime("%Y-%m-%dT%H")
+    return next((i for i, t in enumerate(times) if t.startswith(now_hour_s)), 0)
+
+
+def _at(hourly, key, idx, default):
+    """Return hourly[key][idx], or default if the series is missing."""
+    arr = hourly.get(key)
+    return arr[idx] if arr is not None else default
 
 
 def extract_current_weather(data, now):
@@ -166,14 +427,31 @@ def extract_current_weather(data, now):
     return {
         "temp": current["temperature"],
         "code": current["weathercode"],
-        "feels_like": hourly.get(
-            "apparent_temperature", [current["temperature"]] * len(times)
-        )[idx],
-        "humidity": hourly.get("relativehumidity_2m", [0] * len(times))[idx],
-        "windspeed": hourly.get("windspeed_10m", [0] * len(times))[idx],
+        "feels_like": _at(hourly, "apparent_temperature", idx, current["temperature"]),
+        "humidity": _at(hourly, "relativehumidity_2m", idx, 0),
+        "windspeed": _at(hourly, "windspeed_10m", idx, 0),
     }
 
 
+def output_cache_key(data, now, location_name):
+    """Return a short digest of everything the rendered output depends on.
+
+    That is the whole weather payload, the current hour (which decides the
+    remaining hourly rows), and the location name.
+    """
+    inputs = (data, now.strftime("%Y-%m-%dT%H"), location_name)
+    return hashlib.blake2b(repr(inputs).encode(), digest_size=8).digest()
+
+
+def read_cached_output(key):
+    """Return the output cached under key, or None on a miss."""
+    try:
+        raw = OUTPUT_CACHE.read_bytes()
+    except OSError:
+        return None
+    return raw[len(key) :] if raw.startswith(key) else None
+
+
 def build_current_section(weather, location_name):
     """Build current weather section lines."""
     icon, desc = get_weather_info(weather["code"])
@@ -189,92 +467,88 @@ def build_current_section(weather, location_name):
     ]
 
 
-def build_today_rain_info(hourly, now):
-    """Build rain information for today."""
-    lines = []
-    times = hourly["time"]
-    rain_arr = hourly.get("precipitation_probability", [0] * len(times))
-    precip_arr = hourly.get("precipitation", [0] * len(times))
-
-    rain_probs = []
-    rain_start_time = None
-    precip_total = 0
-
-    for t, prob, precip in zip(times, rain_arr, precip_arr):
-        dt = datetime.fromisoformat(t)
-        if dt.date() == now.date() and dt >= now:
-            rain_probs.append(prob)
-            precip_total += precip
-            if prob > 0 and rain_start_time is None:
-                rain_start_time = dt
-
-    if rain_probs and max(rain_probs) > 0:
-        lines.append(
-            f"🌧️ Chance of rain today: <span foreground='{FG_TEXT}'>{max(rain_probs)}%</span>"
-        )
-        if rain_start_time:
-            lines.append(
-                f"⏱️ Expected rain start: {rain_start_time.strftime('%I:%M %p')}"
-            )
-        else:
-            lines.append("⏱️ Expected rain start: None predicted")
-        lines.append(f"☔ Total predicted rain: {precip_total:.1f} mm")
-        lines.append("")
-
-    return lines
+def build_hourly_sections(hourly, now, tomorrow):
+    """Build today's rain info, today's hourly forecast, and tomorrow's
+    forecast at key times.
 
+    Forecast lines come from a single pass over the hourly data; rain
+    stats are computed on the slice of today's remaining hours.
+    """
+    rain_lines = []
+    today_lines = []
+    tomorrow_lines = []
+    label_width = max(len(v) for v in TIME_LABELS.values())
 
-def build_hourly_forecast(hourly, now, for_date):
-    """Build hourly forecast lines for a specific date."""
-    lines = []
     times = hourly["time"]
     temps = hourly["temperature_2m"]
     codes = hourly["weathercode"]
+    rain_arr = hourly.get("precipitation_probability") or []
+    precip_arr = hourly.get("precipitation") or []
+
+    # Open-Meteo returns canonical "YYYY-MM-DDTHH:MM" strings, so plain
+    # string slices are enough to filter by date and compare times.
+    now_date_s = now.strftime("%Y-%m-%d")
+    now_hm = now.strftime("%H:%M")
+    tomorrow_s = tomorrow.isoformat()
+
+    # Bind hot lookups locally and reuse the color while the temperature
+    # does not change between consecutive rows.
+    display = WEATHER_MAP.get
+    tcol = temp_to_color
+    last_temp = last_color = None
 
     for t, temp, code in zip(times, temps, codes):
-        dt = datetime.fromisoformat(t)
-        if dt.date() != for_date:
-            continue
-        if for_date == now.date() and dt < now:
+        date_s = t[:10]
+        if date_s == now_date_s:
+            prefix = t[11:16]
+            if prefix <= now_hm:
+                continue
+            target = today_lines
+        elif date_s == tomorrow_s:
+            label = TIME_LABELS.get(int(t[11:13]))
+            if not label:
+                continue
+            prefix = f"{label:<{label_width}}"
+            target = tomorrow_lines
+        elif date_s > tomorrow_s:
+            break
+        else:
             continue
 
-        hour = dt.strftime("%H:%M")
-        icon, desc = get_weather_info(code)
-        short_desc = get_short_desc(desc)
-        color = temp_to_color(temp)
-        lines.append(
-            f"{hour} - <span foreground='{color}'>{temp:>2}°C</span> {icon} {short_desc}"
+        icon, _, short_desc = display(code, _UNKNOWN)
+        if temp != last_temp:
+            last_temp, last_color = temp, tcol(temp)
+        target.append(
+            f"{prefix} - <span foreground='{last_color}'>{temp:>2}°C</span> {icon} {short_desc}"
         )
 
-    return lines if lines else ["Hourly forecast unavailable"]
-
-
-def build_tomorrow_forecast(hourly, tomorrow):
-    """Build tomorrow's forecast at key times."""
-    lines = []
-    TIME_LABELS = {6: "Morning", 12: "Midday", 15: "Afternoon", 18: "Evening"}
-    label_width = max(len(v) for v in TIME_LABELS.values())
-
-    times = hourly["time"]
-    temps = hourly["temperature_2m"]
-    codes = hourly["weathercode"]
-
-    for t, temp, code in zip(times, temps, codes):
-        dt = datetime.fromisoformat(t)
-        if dt.date() != tomorrow:
-            continue
-        label = TIME_LABELS.get(dt.hour)
-        if not label:
-            continue
+    # Times are sorted, so today's remaining hours are a contiguous slice.
+    start = bisect_right(times, f"{now_date_s}T{now_hm}")
+    end = bisect_left(times, tomorrow_s)
+    rain_probs = rain_arr[start:end]
+    precip_total = sum(precip_arr[start:end])
 
-        icon, desc = get_weather_info(code)
-        short_desc = get_short_desc(desc)
-        color = temp_to_color(temp)
-        lines.append(
-            f"{label:<{label_width}} - <span foreground='{color}'>{temp:>2}°C</span> {icon} {short_desc}"
+    max_prob = max(rain_probs, default=0)
+    if max_prob > 0:
+        rain_lines.append(
+            f"🌧️ Chance of rain today: <span foreground='{FG_TEXT}'>{max_prob}%</span>"
         )
+        rain_start = next((i for i, p in enumerate(rain_probs) if p > 0), None)
+        if rain_start is not None:
+            rain_start_time = datetime.fromisoformat(times[start + rain_start])
+            rain_lines.append(
+                f"⏱️ Expected rain start: {rain_start_time.strftime('%I:%M %p')}"
+            )
+        else:
+            rain_lines.append("⏱️ Expected rain start: None predicted")
+        rain_lines.append(f"☔ Total predicted rain: {precip_total:.1f} mm")
+        rain_lines.append("")
 
-    return lines if lines else ["Tomorrow forecast unavailable"]
+    return (
+        rain_lines,
+        today_lines if today_lines else ["Hourly forecast unavailable"],
+        tomorrow_lines if tomorrow_lines else ["Tomorrow forecast unavailable"],
+    )
 
 
 def build_daily_forecast(daily, days):
@@ -285,42 +559,57 @@ def build_daily_forecast(daily, days):
     min_temps = daily["temperature_2m_min"]
     codes = daily["weathercode"]
 
+    display = WEATHER_MAP.get
+    tcol = temp_to_color
+
     for i in range(1, min(days + 1, len(dates))):
-        day_name = calendar.day_name[datetime.fromisoformat(dates[i]).weekday()][:3]
-        icon, desc = get_weather_info(codes[i])
-        short_desc = get_short_desc(desc)
+        day_name = _DAY_ABBR[date.fromisoformat(dates[i]).weekday()]
+        icon, _, short_desc = display(codes[i], _UNKNOWN)
         lines.append(
             f"{day_name:<3} "
-            f"⬆️<span foreground='{temp_to_color(max_temps[i])}'>{max_temps[i]:>2}°C</span> "
-            f"⬇️<span foreground='{temp_to_color(min_temps[i])}'>{min_temps[i]:>2}°C</span> "
+            f"⬆️<span foreground='{tcol(max_temps[i])}'>{max_temps[i]:>2}°C</span> "
+            f"⬇️<span foreground='{tcol(min_temps[i])}'>{min_temps[i]:>2}°C</span> "
             f"{icon} {short_desc}"
         )
 
     return lines
 
 
-def render_section(lines, heading, max_len):
-    """Render a tooltip section with heading and separator."""
-    return [
-        f"<span foreground='{FG_HEADER}' font='9'>{heading}</span>",
-        f"<span foreground='#ffffff'>{'─' * max_len}</span>",
-        *[f"<span foreground='{FG_TEXT}' font='9'>{line}</span>" for line in lines],
-        "",
-    ]
+def render_section(lines, heading, separator):
+    """Yield a tooltip section with heading and separator."""
+    yield f"<span foreground='{FG_HEADER}' font='9'>{heading}</span>"
+    yield separator
+    for line in lines:
+        yield f"<span foreground='{FG_TEXT}' font='9'>{line}</span>"
+    yield ""
 
 
 def build_tooltip(sections, max_len):
     """Build complete tooltip from sections."""
     tooltip_lines = []
+    separator = f"<span foreground='#ffffff'>{'─' * max_len}</span>"
     for lines, heading in sections:
-        tooltip_lines += render_section(lines, heading, max_len)
+        tooltip_lines.extend(render_section(lines, heading, separator))
     return "\n".join(tooltip_lines)
 
 
 def main():
+    # Speculatively fetch weather for the last known location while the
+    # current location is being resolved; most runs it has not changed.
+    # The request has no side effects, so it is simply abandoned if the
+    # location turns out to be different.
+    cached = load_cached_location()
+    pending = None
+    if cached:
+        url = build_api_url(*cached[:2])
+        if read_weather_cache(url) is None:
+            pending = queue.Queue()
+            run_in_background(pending, _get_json, url)
+
     lat, lon, location_name = get_location_by_ip()
-    url = build_api_url(lat, lon)
-    data = fetch_weather_data(url)
+    if pending is not None and (lat, lon) != cached[:2]:
+        pending = None
+    data = fetch_weather_data(build_api_url(lat, lon), pending)
     now = datetime.now()
     tomorrow = now.date() + timedelta(days=1)
 
@@ -329,16 +618,23 @@ def main():
     except Exception:
         fail("Failed to parse current weather")
 
+    # Within the same hour the tooltip is usually identical to the last run.
+    key = output_cache_key(data, now, location_name)
+    output = read_cached_output(key)
+    if output is not None:
+        emit(output)
+        return
+
     icon, _ = get_weather_info(weather["code"])
     text = f" | {icon} <span foreground='{temp_to_color(weather['temp'])}'>{weather['temp']}°C</span>"
 
     hourly = data["hourly"]
     daily = data["daily"]
     current_lines = build_current_section(weather, location_name)
-    today_lines = build_today_rain_info(hourly, now) + build_hourly_forecast(
-        hourly, now, now.date()
+    rain_lines, hourly_lines, tomorrow_lines = build_hourly_sections(
+        hourly, now, tomorrow
     )
-    tomorrow_lines = build_tomorrow_forecast(hourly, tomorrow)
+    today_lines = rain_lines + hourly_lines
     daily_lines = build_daily_forecast(daily, DAYS_FORECAST)
 
     all_lines = current_lines + today_lines + tomorrow_lines + daily_lines
@@ -348,7 +644,7 @@ def main():
         "⛅ Tomorrow Forecast:",
         f"📅 Upcoming {DAYS_FORECAST}-day Forecast:",
     ]
-    max_len = max_line_length(all_lines + headings)
+    max_len = max_line_length(all_lines, headings)
 
     sections = [
         (current_lines, f"🌍 Current Weather - {location_name}"),
@@ -357,11 +653,9 @@ def main():
         (daily_lines, f"📅 Upcoming {DAYS_FORECAST}-day Forecast:"),
     ]
     tooltip = build_tooltip(sections, max_len)
-    print(
-        json.dumps(
-            {"text": text, "tooltip": tooltip, "markup": "pango"}, ensure_ascii=False
-        )
-    )
+    output = _dumps({"text": text, "tooltip": tooltip, "markup": "pango"})
+    write_atomic(OUTPUT_CACHE, key + output)
+    emit(output)
 
 
 if __name__ == "__main__":